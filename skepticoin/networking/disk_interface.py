@@ -67,9 +67,11 @@ class DiskInterface:
         if self.last_saved_peers != db:
 
             if db:
-                with open("peers.json", "w") as f:
-                    json.dump(db, f, indent=4)
+                with open("peers.json.tmp", "w") as f:
+                    json.dump(db, f, separators=(",", ":"))
+                os.replace("peers.json.tmp", "peers.json")
             else:
+                # no peers.json means: bootstrap from PEER_URLS on the next start
                 os.remove("peers.json")
 
             self.last_saved_peers = db
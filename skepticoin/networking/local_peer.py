@@ -1,18 +1,19 @@
 
+from collections import Counter
 import logging
 import random
-import selectors
 from skepticoin.networking.remote_peer import ConnectedRemotePeer, DisconnectedRemotePeer, IRRELEVANT
-from skepticoin.networking.remote_peer import INCOMING, LISTENING_SOCKET, OUTGOING
+from skepticoin.networking.remote_peer import INCOMING, OUTGOING
 from skepticoin.networking.disk_interface import DiskInterface
+from skepticoin.networking.poller import DefaultPoller, EVENT_READ, EVENT_WRITE, InvalidFileDescriptorError
 import socket
 import traceback
 import sys
 from datetime import datetime
 
-from typing import Optional
+from typing import Iterator, Optional
 from skepticoin.humans import human
-from skepticoin.networking.params import PORT
+from skepticoin.networking.params import PORT, RECV_CHUNK, RECV_CHUNKS_PER_EVENT
 from skepticoin.params import DESIRED_BLOCK_TIMESPAN
 from skepticoin.networking.manager import ChainManager, NetworkManager
 from skepticoin.utils import calc_work
@@ -32,8 +33,13 @@ class LocalPeer:
         self.port: Optional[
             int
         ] = None  # TODO perhaps just push this into the signature here?
-        self.nonce = random.randrange(pow(2, 32))
-        self.selector = selectors.DefaultSelector()
+        self.nonce = random.getrandbits(32)
+        self.selector = DefaultPoller()
+        self.max_selector_map_size = MAX_SELECTOR_SIZE_BY_PLATFORM.get(sys.platform, 64)
+
+        # Reused for all reads; the event loop is single-threaded and handle_receive_data() consumes synchronously.
+        self.recv_buffer = bytearray(RECV_CHUNK)
+        self.listening_socket: Optional[socket.socket] = None
         self.network_manager = NetworkManager(self, disk_interface=disk_interface)
         self.chain_manager = ChainManager(self, int(time()))
         self.managers = [
@@ -57,7 +63,8 @@ class LocalPeer:
             lsock.bind(("", port))
             lsock.listen()
             lsock.setblocking(False)
-            self.selector.register(lsock, selectors.EVENT_READ, data=LISTENING_SOCKET)
+            self.selector.register(lsock, EVENT_READ, data=lambda mask: self.handle_incoming_connection(lsock))
+            self.listening_socket = lsock
         except Exception:
             self.logger.error("Uncaught exception in LocalPeer.start_listening()")
             self.logger.error(traceback.format_exc())
@@ -67,32 +74,53 @@ class LocalPeer:
         # TODO only accept a single (incoming, outgoing) connection from each peer
         conn, addr = sock.accept()
         conn.setblocking(False)
-        events = selectors.EVENT_READ
+        events = EVENT_READ
 
         remote_host = conn.getpeername()[0]
         remote_port = conn.getpeername()[1]
         remote_peer = ConnectedRemotePeer(self, remote_host, remote_port, INCOMING, None, conn, ban_score=0)
-        self.selector.register(conn, events, data=remote_peer)
+        self.selector.register(conn, events, data=remote_peer.handle_selector_event)
         self.network_manager.handle_peer_connected(remote_peer)
 
-    def handle_remote_peer_selector_event(
-        self, key: selectors.SelectorKey, mask: int
-    ) -> None:
+    def recv_available(self, sock: socket.socket) -> Iterator[memoryview]:
+        """Drain what the kernel has buffered for sock, yielding each read (at most RECV_CHUNK bytes) as a view on
+        self.recv_buffer. A view is only valid until the next one is requested. An empty view means the connection was
+        closed remotely."""
+        buf = self.recv_buffer
+
+        for i in range(RECV_CHUNKS_PER_EVENT):
+            try:
+                n = sock.recv_into(buf)
+            except BlockingIOError:
+                if i == 0:
+                    raise
+                break  # drained exactly at a chunk boundary
+
+            with memoryview(buf)[:n] as view:
+                yield view
+
+            if n < RECV_CHUNK:
+                break  # a short read (or EOF): the kernel's buffer is drained
+
+    def handle_remote_peer_selector_event(self, remote_peer: ConnectedRemotePeer, mask: int) -> None:
         # self.logger.info("LocalPeer.handle_remote_peer_selector_event()")
 
-        sock: socket.socket = key.fileobj  # type: ignore
-        remote_peer: ConnectedRemotePeer = key.data
+        sock = remote_peer.sock
 
         try:
-            if mask & selectors.EVENT_READ:
-                recv_data = sock.recv(1024)
+            if mask & EVENT_READ:
+                for recv_data in self.recv_available(sock):
+                    if not recv_data:
+                        self.disconnect(remote_peer, "connection closed remotely")  # is this so?
+                        break
 
-                if recv_data:
+                    # recv_data is released after the call: handle_receive_data must not hold on to it.
                     remote_peer.handle_receive_data(recv_data)
-                else:
-                    self.disconnect(remote_peer, "connection closed remotely")  # is this so?
 
-            if mask & selectors.EVENT_WRITE:
+                    if sock.fileno() < 0:
+                        break  # disconnected as a consequence of what was received
+
+            if mask & EVENT_WRITE:
                 remote_peer.handle_can_send(sock)
 
         except OSError as e:  # e.g. ConnectionRefusedError, "Bad file descriptor"
@@ -100,14 +128,16 @@ class LocalPeer:
             self.logger.info("%15s Disconnecting remote peer %s" % (remote_peer.host, e))
             self.disconnect(remote_peer, "OS error")
 
+        except InvalidFileDescriptorError as e:
+            # the socket was closed as a consequence of something that was read; not a programming error.
+            self.logger.info("%15s Disconnecting remote peer %s" % (remote_peer.host, e))
+            self.disconnect(remote_peer, "Exception")
+
         except Exception as e:
             # We take the position that any exception caused is reason to disconnect. This allows the code that talks to
             # peers to not have special cases for exceptions since they will all be caught by this catch-all.
             self.logger.info("%15s Disconnecting remote peer %s" % (remote_peer.host, e))
-
-            if "ValueError: Invalid file descriptor: " not in str(e):
-                self.logger.warning(traceback.format_exc())  # be loud... this is likely a programming error.
-
+            self.logger.warning(traceback.format_exc())  # be loud... this is likely a programming error.
             self.disconnect(remote_peer, "Exception")
 
     def disconnect(self, remote_peer: ConnectedRemotePeer, reason: str = "") -> None:
@@ -127,9 +157,7 @@ class LocalPeer:
 
     def start_outgoing_connection(self, disconnected_peer: DisconnectedRemotePeer) -> None:
 
-        max_selector_map_size = MAX_SELECTOR_SIZE_BY_PLATFORM.get(sys.platform, 64)
-
-        if len(self.selector.get_map()) >= max_selector_map_size:
+        if len(self.selector) >= self.max_selector_map_size:
             # We hit the platform-dependent limit of connected peers
             # TODO this is actually a hack, find a proper solution
             return
@@ -141,10 +169,10 @@ class LocalPeer:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.setblocking(False)
         sock.connect_ex(server_addr)
-        events = selectors.EVENT_READ
+        events = EVENT_READ
 
         remote_peer = disconnected_peer.as_connected(self, sock)
-        self.selector.register(sock, events, data=remote_peer)
+        self.selector.register(sock, events, data=remote_peer.handle_selector_event)
         self.network_manager.handle_peer_connected(remote_peer)
 
     def step_managers(self, current_time: int) -> None:
@@ -155,15 +183,14 @@ class LocalPeer:
             manager.step(current_time)
 
     def handle_selector_events(self) -> None:
-        events = self.selector.select(timeout=1)  # TODO this is for the managers to do something... tune it though
-        for key, mask in events:
+        events = self.selector.poll(timeout=1)  # TODO this is for the managers to do something... tune it though
+        # the registered data is the handler for the socket: handle_incoming_connection for the listening socket,
+        # ConnectedRemotePeer.handle_selector_event for everything else.
+        for handler, mask in events:
             if not self.running:
                 break
 
-            if key.data is LISTENING_SOCKET:
-                self.handle_incoming_connection(key.fileobj)  # type: ignore
-            else:
-                self.handle_remote_peer_selector_event(key, mask)
+            handler(mask)
 
     def run(self) -> None:
         self.running = True
@@ -178,6 +205,8 @@ class LocalPeer:
         finally:
             self.logger.info("%15s LocalPeer selector close" % "")
             self.selector.close()
+            if self.listening_socket is not None:
+                self.listening_socket.close()
             self.logger.info("%15s LocalPeer selector closed" % "")
 
     def stop(self) -> None:
@@ -187,68 +216,68 @@ class LocalPeer:
     def show_stats(self) -> None:
         coinstate = self.chain_manager.coinstate
 
-        out = "NETWORK - %d connected peers: \n" % len(self.network_manager.get_active_peers())
-        for p in self.network_manager.get_active_peers():
+        peers = self.network_manager.get_active_peers()
+
+        parts = [f"NETWORK - {len(peers)} connected peers: \n"]
+        for p in peers:
             # TODO: Fix inconsistent usage of datatypes for PORT. int or str, pick one!
-            out += "  %15s:%s %s,\n" % (p.host, p.port if p.port != IRRELEVANT else "....", p.direction)  # type: ignore
+            port = p.port if p.port != IRRELEVANT else "...."  # type: ignore
+            parts.append(f"  {p.host:>15}:{port} {p.direction},\n")
 
-        out += "CHAIN - "
+        parts.append("CHAIN - ")
+        min_height = coinstate.head().height - 10
         for (head, lca) in coinstate.forks():
-            if head.height < coinstate.head().height - 10:
+            if head.height < min_height:
                 continue  # don't show forks which are out-ran by more than 10 blocks
 
-            out += "Height = %s, " % head.height
-            out += "Date/time = %s\n" % datetime.fromtimestamp(head.timestamp).isoformat()
+            parts.append(f"Height = {head.height}, ")
+            parts.append(f"Date/time = {datetime.fromtimestamp(head.timestamp).isoformat()}\n")
             if head.height != lca.height:
-                out += "  diverges for %s blocks\n" % (head.height - lca.height)
-            out += "\n"
+                parts.append(f"  diverges for {head.height - lca.height} blocks\n")
+            parts.append("\n")
+
+        out = "".join(parts)
 
         if out != self.last_stats_output:
             print(out)
             self.last_stats_output = out
 
     def show_network_stats(self) -> None:
-        print("NETWORK")
-        print("Nr. of connected peers:", len(self.network_manager.get_active_peers()))
-        print("Nr. of unique hosts   :", len(set(p.host for p in self.network_manager.get_active_peers())))
-        print("Nr. of listening hosts:",
-              len([p for p in self.network_manager.get_active_peers() if p.direction == OUTGOING]))
+        peers = self.network_manager.get_active_peers()
 
-        per_host = {}
+        hosts = dict.fromkeys(p.host for p in peers)  # unique hosts, in order of appearance
+        incoming = Counter(p.host for p in peers if p.direction == INCOMING)
+        outgoing = Counter(p.host for p in peers if p.direction == OUTGOING)
 
-        for p in self.network_manager.get_active_peers():
-            if p.host not in per_host:
-                per_host[p.host] = (0, 0)
-
-            incoming, outgoing = per_host[p.host]
-            if p.direction == INCOMING:
-                per_host[p.host] = incoming + 1, outgoing
-            else:
-                per_host[p.host] = incoming, outgoing + 1
+        print("NETWORK")
+        print("Nr. of connected peers:", len(peers))
+        print("Nr. of unique hosts   :", len(hosts))
+        print("Nr. of listening hosts:", sum(outgoing.values()))
 
         print("\ndetails:")
-        for host, (incoming, outgoing) in per_host.items():
-            print("%15s: %2d incoming, %2d outgoing" % (host, incoming, outgoing))
+        for host in hosts:
+            print(f"{host:>15}: {incoming[host]:2d} incoming, {outgoing[host]:2d} outgoing")
 
     def show_chain_stats(self) -> None:
         coinstate = self.chain_manager.coinstate
+        head = coinstate.head()
+        block_by_height = coinstate.at_head.block_by_height
 
         def get_block_timespan_factor(n: int) -> float:
             # Current block duration over past n block as a factor of DESIRED_BLOCK_TIMESPAN, e.g. 0.5 for twice desired
             # speed
-            diff = coinstate.head().timestamp - coinstate.at_head.block_by_height[coinstate.head().height - n].timestamp
+            diff = head.timestamp - block_by_height[head.height - n].timestamp
             return diff / (DESIRED_BLOCK_TIMESPAN * n)  # type: ignore
 
         def get_network_hash_rate(n: int) -> float:
-            total_over_blocks = sum(
-                calc_work(coinstate.at_head.block_by_height[coinstate.head().height - i].target) for i in range(n))
+            total_over_blocks = sum(calc_work(block_by_height[head.height - i].target) for i in range(n))
 
-            diff = coinstate.head().timestamp - coinstate.at_head.block_by_height[coinstate.head().height - n].timestamp
+            diff = head.timestamp - block_by_height[head.height - n].timestamp
 
             return total_over_blocks / diff  # type: ignore
 
         print("WASTELAND STATS")
-        print("Current target: ", human(coinstate.head().target))
-        print("Current work:   ", calc_work(coinstate.head().target))
+        print("Current target: ", human(head.target))
+        print("Current work:   ", calc_work(head.target))
         print("Timespan factor:", get_block_timespan_factor(100))
         print("Hash rate:      ", get_network_hash_rate(100))
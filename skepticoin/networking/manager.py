@@ -22,6 +22,7 @@ from .params import (
 )
 from skepticoin.datatypes import Block, Transaction
 from skepticoin.networking.remote_peer import ConnectedRemotePeer, DisconnectedRemotePeer, OUTGOING
+from skepticoin.networking.poller import InvalidFileDescriptorError
 
 from typing import TYPE_CHECKING
 
@@ -126,7 +127,7 @@ class NetworkManager(Manager):
                 # The traceback that's printed below will help in this matching effort.
 
                 self.local_peer.logger.info("%15s ChainManager.broadcast_message error %s" % (peer.host, e))
-                if "ValueError: Invalid file descriptor: " not in str(e):
+                if not isinstance(e, InvalidFileDescriptorError):
                     # be loud... this is likely a programming error.
                     self.local_peer.logger.warning(traceback.format_exc())
 
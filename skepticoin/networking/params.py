@@ -11,6 +11,13 @@ GET_PEERS_INTERVAL = 60 * 30
 
 MAX_MESSAGE_SIZE = 32 * 1024 * 1024
 
+# size of the (reused) receive buffer, i.e. the most a single recv() call reads
+RECV_CHUNK = 64 * 1024
+
+# a readable event drains the socket with at most this many reads (1 MiB), so one busy peer can't hold up the others;
+# whatever is left is picked up on the next iteration of the event loop
+RECV_CHUNKS_PER_EVENT = 16
+
 MAX_IBD_PEERS = 1
 IBD_PEER_TIMEOUT = 60
 IBD_VALIDATION_SKIP = 1000
@@ -0,0 +1,143 @@
+"""
+Thin replacement for selectors.DefaultSelector, tuned for LocalPeer's event loop.
+
+selectors.EpollSelector.select() builds a SelectorKey lookup for each ready fd and then translates the epoll bitmask in
+pure Python. We only ever need the `data` that was registered with a socket, so the epoll-based poller below maps
+fd -> data in a plain dict and yields `(data, mask)` pairs directly. On platforms without epoll we fall back to
+selectors.DefaultSelector behind the same interface.
+"""
+
+import select
+import selectors
+import socket
+from typing import Any, Dict, List, Tuple, Type, Union
+
+
+EVENT_READ = selectors.EVENT_READ
+EVENT_WRITE = selectors.EVENT_WRITE
+
+
+class InvalidFileDescriptorError(ValueError):
+    """Raised when registering or modifying a socket that has already been closed."""
+
+
+def _fileno(sock: socket.socket) -> int:
+    fd = sock.fileno()
+    if fd < 0:
+        raise InvalidFileDescriptorError("Invalid file descriptor: {}".format(fd))
+    return fd
+
+
+class SelectorPoller:
+    """Portable fallback on top of selectors.DefaultSelector."""
+
+    def __init__(self) -> None:
+        self._selector = selectors.DefaultSelector()
+
+    def __len__(self) -> int:
+        return len(self._selector.get_map())
+
+    def register(self, sock: socket.socket, events: int, data: Any) -> None:
+        _fileno(sock)
+        self._selector.register(sock, events, data=data)
+
+    def modify(self, sock: socket.socket, events: int, data: Any) -> None:
+        _fileno(sock)
+        self._selector.modify(sock, events, data=data)
+
+    def unregister(self, sock: socket.socket) -> None:
+        self._selector.unregister(sock)
+
+    def poll(self, timeout: float) -> List[Tuple[Any, int]]:
+        return [(key.data, mask) for key, mask in self._selector.select(timeout=timeout)]
+
+    def close(self) -> None:
+        self._selector.close()
+
+
+DefaultPoller: Type[Union["EpollPoller", SelectorPoller]]
+
+if hasattr(select, "epoll"):
+    NOT_EPOLLIN = ~select.EPOLLIN
+    NOT_EPOLLOUT = ~select.EPOLLOUT
+
+    class EpollPoller:
+        """Drives select.epoll directly; Linux only."""
+
+        def __init__(self) -> None:
+            self._epoll = select.epoll()
+            self._fd_to_data: Dict[int, Tuple[Any, int]] = {}  # fd -> (data, registered events)
+
+            # sockets may be closed before they are unregistered, at which point fileno() returns -1.
+            self._sock_to_fd: Dict[socket.socket, int] = {}
+
+        def __len__(self) -> int:
+            return len(self._fd_to_data)
+
+        @staticmethod
+        def _epoll_mask(events: int) -> int:
+            mask = 0
+            if events & EVENT_READ:
+                mask |= select.EPOLLIN
+            if events & EVENT_WRITE:
+                mask |= select.EPOLLOUT
+            return mask
+
+        def register(self, sock: socket.socket, events: int, data: Any) -> None:
+            fd = _fileno(sock)
+            if fd in self._fd_to_data:
+                raise KeyError("{!r} (FD {}) is already registered".format(sock, fd))
+
+            self._epoll.register(fd, self._epoll_mask(events))
+            self._fd_to_data[fd] = (data, events)
+            self._sock_to_fd[sock] = fd
+
+        def modify(self, sock: socket.socket, events: int, data: Any) -> None:
+            fd = _fileno(sock)
+            if fd not in self._fd_to_data:
+                raise KeyError("{!r} is not registered".format(sock))
+
+            self._epoll.modify(fd, self._epoll_mask(events))
+            self._fd_to_data[fd] = (data, events)
+
+        def unregister(self, sock: socket.socket) -> None:
+            fd = self._sock_to_fd.pop(sock)
+            del self._fd_to_data[fd]
+            try:
+                self._epoll.unregister(fd)
+            except OSError:
+                # the fd was already closed (and thereby removed from the epoll set by the kernel)
+                pass
+
+        def poll(self, timeout: float) -> List[Tuple[Any, int]]:
+            fd_to_data = self._fd_to_data
+            ready = []
+
+            # like selectors.EpollSelector: error/hangup conditions are reported as both readable and writable, but
+            # only for the events the socket was actually registered for.
+            for fd, event in self._epoll.poll(timeout, max(len(fd_to_data), 1)):
+                entry = fd_to_data.get(fd)
+                if entry is None:
+                    continue
+
+                data, events = entry
+
+                mask = 0
+                if event & NOT_EPOLLIN:
+                    mask |= EVENT_WRITE
+                if event & NOT_EPOLLOUT:
+                    mask |= EVENT_READ
+
+                ready.append((data, mask & events))
+
+            return ready
+
+        def close(self) -> None:
+            self._epoll.close()
+            self._fd_to_data.clear()
+            self._sock_to_fd.clear()
+
+    DefaultPoller = EpollPoller
+
+else:
+    DefaultPoller = SelectorPoller
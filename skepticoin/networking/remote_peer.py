@@ -9,11 +9,10 @@ if TYPE_CHECKING:
     from skepticoin.networking.local_peer import LocalPeer
 
 from time import time
-from typing import List, Optional
+from typing import List, Optional, Union
 
 import struct
 import socket
-import selectors
 
 from skepticoin.humans import human
 from .params import (
@@ -26,6 +25,7 @@ from .params import (
 )
 from skepticoin.datatypes import Block, Transaction
 from skepticoin.networking.params import MAX_MESSAGE_SIZE
+from skepticoin.networking.poller import EVENT_READ, EVENT_WRITE
 from .messages import (
     DATATYPES,
     SupportedVersion,
@@ -47,7 +47,6 @@ from skepticoin.__version__ import __version__
 import random
 from skepticoin.consensus import validate_block_by_itself, validate_block_in_coinstate
 
-LISTENING_SOCKET = "LISTENING_SOCKET"
 IRRELEVANT = "IRRELEVANT"  # TODO don't use a string for a port number
 MAGIC = b'MAJI'
 
@@ -82,37 +81,50 @@ class MessageReceiver:
     def __init__(self, peer: ConnectedRemotePeer):
         self.peer = peer
 
-        self.buffer = b''
+        self.buffer = bytearray()
         self.magic_read = False
-        self.len = None
+        self.len: Optional[int] = None
+
+    def receive(self, data: Union[bytes, memoryview]) -> None:
+        buffer = self.buffer
+        buffer += data
+
+        # parse by offset and trim the consumed part once at the end, rather than re-slicing after each message
+        # (multiple messages could be received in a single socket read)
+        pos = 0
+        while True:
+            if not self.magic_read:
+                if len(buffer) - pos < 4:
+                    break
 
-    def receive(self, data: bytes) -> None:
-        self.buffer += data
+                if buffer[pos:pos + 4] != MAGIC:
+                    raise Exception("Insufficient magic")
 
-        if not self.magic_read and len(self.buffer) >= 4:
-            magic = self.buffer[:4]
-            if magic != MAGIC:
-                raise Exception("Insufficient magic")
-            else:
                 self.magic_read = True
+                pos += 4
 
-            self.buffer = self.buffer[4:]
+            if self.len is None:
+                if len(buffer) - pos < 4:
+                    break
 
-        if self.len is None and len(self.buffer) >= 4:
-            (self.len,) = struct.unpack(b">I", self.buffer[:4])
+                (self.len,) = struct.unpack_from(b">I", buffer, pos)
 
-            if self.len > MAX_MESSAGE_SIZE:  # type: ignore
-                raise Exception("len > MAX_MESSAGE_SIZE")
+                if self.len > MAX_MESSAGE_SIZE:
+                    raise Exception("len > MAX_MESSAGE_SIZE")
 
-            self.buffer = self.buffer[4:]
+                pos += 4
 
-        if self.len is not None and self.len <= len(self.buffer):
-            self.handle_message_data(self.buffer[:self.len])
+            if len(buffer) - pos < self.len:
+                break
 
-            self.buffer = self.buffer[self.len:]
+            message_data = bytes(buffer[pos:pos + self.len])
+            pos += self.len
             self.magic_read = False
             self.len = None
-            self.receive(b"")  # recurse to repeat (multiple messages could be received in a single socket read)
+
+            self.handle_message_data(message_data)
+
+        del buffer[:pos]
 
     def handle_message_data(self, message_data: bytes) -> None:
         f = BytesIO(message_data)
@@ -251,13 +263,16 @@ class ConnectedRemotePeer(RemotePeer):
 
     def start_sending(self) -> None:
         try:
-            self.local_peer.selector.modify(self.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, data=self)
+            self.local_peer.selector.modify(self.sock, EVENT_READ | EVENT_WRITE, data=self.handle_selector_event)
         except ValueError:
             self.local_peer.logger.error("%15s ConnectedRemotePeer.start_sending() ValueError: %s\n"
                                          % (self.host, traceback.format_exc()))
 
     def stop_sending(self) -> None:
-        self.local_peer.selector.modify(self.sock, selectors.EVENT_READ, data=self)
+        self.local_peer.selector.modify(self.sock, EVENT_READ, data=self.handle_selector_event)
+
+    def handle_selector_event(self, mask: int) -> None:
+        self.local_peer.handle_remote_peer_selector_event(self, mask)
 
     def handle_message_received(self, header: MessageHeader, message: Message) -> None:
         self.local_peer.logger.info("%15s ConnectedRemotePeer.handle_message_received(%s %s)" % (
@@ -303,7 +318,8 @@ class ConnectedRemotePeer(RemotePeer):
                 self.send_buffer = self.send_backlog.pop(0)
                 self.handle_can_send(sock)
 
-    def handle_receive_data(self, data: bytes) -> None:
+    def handle_receive_data(self, data: memoryview) -> None:
+        """data is a view on LocalPeer's receive buffer and is only valid for the duration of this call."""
         self.local_peer.logger.info("%15s ConnectedRemotePeer.handle_receive_data(%d)" % (self.host, len(data)))
         self.receiver.receive(data)
 
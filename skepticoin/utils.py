@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from skepticoin.datatypes import Block
 
 from .humans import human
@@ -7,5 +9,6 @@ def block_filename(block: Block) -> str:
     return "%08d-%s" % (block.height, human(block.hash()))
 
 
+@lru_cache(maxsize=256)  # targets only change at readjustments, so consecutive blocks mostly share one
 def calc_work(target: bytes) -> int:
     return pow(2, 32 * 8) // int.from_bytes(target, byteorder="big", signed=False)  # type: ignore
@@ -0,0 +1,66 @@
+import socket
+import struct
+
+from skepticoin.networking.local_peer import LocalPeer
+from skepticoin.networking.params import RECV_CHUNK
+from skepticoin.networking.remote_peer import MAGIC, MessageReceiver
+
+
+class CollectingMessageReceiver(MessageReceiver):
+    def __init__(self):
+        super().__init__(None)
+        self.messages = []
+
+    def handle_message_data(self, message_data):
+        self.messages.append(message_data)
+
+
+def _frame(payload):
+    return MAGIC + struct.pack(b">I", len(payload)) + payload
+
+
+def _many_small_messages(count):
+    return [b"%05d" % i + b"x" * 295 for i in range(count)]
+
+
+def test_receive_many_messages_in_one_call():
+    # more messages in a single call than the recursion limit would allow, had receive() been recursive
+    payloads = _many_small_messages(4000)
+    receiver = CollectingMessageReceiver()
+
+    receiver.receive(b"".join(_frame(p) for p in payloads))
+
+    assert receiver.messages == payloads
+    assert len(receiver.buffer) == 0
+
+
+def test_recv_available_drains_in_chunks():
+    payloads = _many_small_messages(500)
+    data = b"".join(_frame(p) for p in payloads)
+    assert len(data) > 2 * RECV_CHUNK
+
+    local_peer = LocalPeer()
+    receiver = CollectingMessageReceiver()
+    a, b = socket.socketpair()
+
+    try:
+        a.setblocking(False)
+        b.sendall(data)
+
+        reads = []
+        for view in local_peer.recv_available(a):
+            reads.append(len(view))
+            receiver.receive(view)
+
+        assert sum(reads) == len(data)
+        assert max(reads) <= RECV_CHUNK
+        assert receiver.messages == payloads
+        assert len(local_peer.recv_buffer) == RECV_CHUNK  # reused, never grown
+
+        b.close()
+        assert [len(view) for view in local_peer.recv_available(a)] == [0]
+
+    finally:
+        local_peer.selector.close()
+        a.close()
+        b.close()
@@ -0,0 +1,69 @@
+import socket
+
+import pytest
+
+from skepticoin.networking.poller import (
+    DefaultPoller, SelectorPoller, EVENT_READ, EVENT_WRITE, InvalidFileDescriptorError
+)
+
+
+@pytest.mark.parametrize("poller_class", [DefaultPoller, SelectorPoller])
+def test_poller_read_write_events(poller_class):
+    a, b = socket.socketpair()
+    poller = poller_class()
+
+    try:
+        poller.register(a, EVENT_READ, data="a")
+        assert len(poller) == 1
+        assert poller.poll(timeout=0) == []
+
+        b.send(b"x")
+        assert poller.poll(timeout=1) == [("a", EVENT_READ)]
+
+        poller.modify(a, EVENT_READ | EVENT_WRITE, data="A")
+        assert poller.poll(timeout=1) == [("A", EVENT_READ | EVENT_WRITE)]
+
+        poller.unregister(a)
+        assert len(poller) == 0
+        assert poller.poll(timeout=0) == []
+
+    finally:
+        poller.close()
+        a.close()
+        b.close()
+
+
+@pytest.mark.parametrize("poller_class", [DefaultPoller, SelectorPoller])
+def test_poller_hangup_reports_registered_events_only(poller_class):
+    a, b = socket.socketpair()
+    poller = poller_class()
+
+    try:
+        poller.register(a, EVENT_READ, data="a")
+        b.close()
+
+        assert poller.poll(timeout=1) == [("a", EVENT_READ)]
+
+    finally:
+        poller.close()
+        a.close()
+
+
+@pytest.mark.parametrize("poller_class", [DefaultPoller, SelectorPoller])
+def test_poller_unregister_closed_socket(poller_class):
+    a, b = socket.socketpair()
+    poller = poller_class()
+
+    try:
+        poller.register(a, EVENT_READ, data="a")
+        a.close()
+
+        with pytest.raises(InvalidFileDescriptorError):
+            poller.modify(a, EVENT_READ | EVENT_WRITE, data="a")
+
+        poller.unregister(a)
+        assert len(poller) == 0
+
+    finally:
+        poller.close()
+        b.close()
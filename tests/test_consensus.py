@@ -1,5 +1,7 @@
 from copy import deepcopy
+from functools import lru_cache
 import immutables
+import os
 import pytest
 from pathlib import Path
 
@@ -41,15 +43,18 @@ CHAIN_TESTDATA_PATH = Path(__file__).parent.joinpath("testdata/chain")
 example_public_key = SECP256k1PublicKey(b'x' * 64)
 
 
+@lru_cache(maxsize=None)
 def _read_chain_from_disk(max_height):
+    # CoinState.add_block_no_validation returns a new CoinState, so the result can safely be shared between tests.
     coinstate = CoinState.zero()
 
-    for file_path in sorted(CHAIN_TESTDATA_PATH.iterdir()):
-        height = int(file_path.name.split("-")[0])
-        if height > max_height:
-            return coinstate
+    # numeric sort on the height prefix: correct even if the filenames were not zero-padded
+    entries = [(int(entry.name.split("-")[0]), entry.path) for entry in os.scandir(CHAIN_TESTDATA_PATH)]
+    entries = sorted(entry for entry in entries if entry[0] <= max_height)
 
-        block = Block.stream_deserialize(open(file_path, 'rb'))
+    for _, path in entries:
+        with open(path, 'rb') as f:
+            block = Block.stream_deserialize(f)
         coinstate = coinstate.add_block_no_validation(block)
 
     return coinstate